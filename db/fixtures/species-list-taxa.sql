@@ -0,0 +1,23 @@
+BEGIN TRANSACTION;
+-- accepted species, and a synonym with a different name
+INSERT INTO "taxonomic_units" ("tsn","unit_name1","unit_name2","unit_name3","name_usage","credibility_rtng","initial_time_stamp","parent_tsn","kingdom_id","rank_id","update_date","complete_name") VALUES (900001,'Carex','lurida',NULL,'accepted','TWG standards met','2000-01-01 00:00:00',NULL,3,220,'2020-01-01','Carex lurida');
+INSERT INTO "taxonomic_units" ("tsn","unit_name1","unit_name2","unit_name3","name_usage","credibility_rtng","initial_time_stamp","parent_tsn","kingdom_id","rank_id","update_date","complete_name") VALUES (900002,'Carex','tuberculata',NULL,'not accepted','TWG standards met','2000-01-01 00:00:00',NULL,3,220,'2020-01-01','Carex tuberculata');
+INSERT INTO "synonym_links" VALUES (900002,900001,'2020-01-01');
+-- a synonym with the same name as the accepted 'Carex lurida' above
+INSERT INTO "taxonomic_units" ("tsn","unit_name1","unit_name2","unit_name3","name_usage","credibility_rtng","initial_time_stamp","parent_tsn","kingdom_id","rank_id","update_date","complete_name") VALUES (900003,'Carex','baileyi',NULL,'accepted','TWG standards met','2000-01-01 00:00:00',NULL,3,220,'2020-01-01','Carex baileyi');
+INSERT INTO "taxonomic_units" ("tsn","unit_name1","unit_name2","unit_name3","name_usage","credibility_rtng","initial_time_stamp","parent_tsn","kingdom_id","rank_id","update_date","complete_name") VALUES (900004,'Carex','lurida',NULL,'not accepted','TWG standards met','2000-01-01 00:00:00',NULL,3,220,'2020-01-01','Carex lurida');
+INSERT INTO "synonym_links" VALUES (900004,900003,'2020-01-01');
+-- an accepted variety, and a species that is a synonym of it
+INSERT INTO "taxonomic_units" ("tsn","unit_name1","unit_name2","unit_name3","name_usage","credibility_rtng","initial_time_stamp","parent_tsn","kingdom_id","rank_id","update_date","complete_name") VALUES (900005,'Viola','sororia','affinis','accepted','TWG standards met','2000-01-01 00:00:00',NULL,3,240,'2020-01-01','Viola sororia var. affinis');
+INSERT INTO "taxonomic_units" ("tsn","unit_name1","unit_name2","unit_name3","name_usage","credibility_rtng","initial_time_stamp","parent_tsn","kingdom_id","rank_id","update_date","complete_name") VALUES (900006,'Viola','affinis',NULL,'not accepted','TWG standards met','2000-01-01 00:00:00',NULL,3,220,'2020-01-01','Viola affinis');
+INSERT INTO "synonym_links" VALUES (900006,900005,'2020-01-01');
+-- a genus synonym that resolves to an accepted genus
+INSERT INTO "taxonomic_units" ("tsn","unit_name1","unit_name2","unit_name3","name_usage","credibility_rtng","initial_time_stamp","parent_tsn","kingdom_id","rank_id","update_date","complete_name") VALUES (900007,'Symphyotrichum',NULL,NULL,'accepted','TWG standards met','2000-01-01 00:00:00',NULL,3,180,'2020-01-01','Symphyotrichum');
+INSERT INTO "taxonomic_units" ("tsn","unit_name1","unit_name2","unit_name3","name_usage","credibility_rtng","initial_time_stamp","parent_tsn","kingdom_id","rank_id","update_date","complete_name") VALUES (900008,'Aster',NULL,NULL,'not accepted','TWG standards met','2000-01-01 00:00:00',NULL,3,180,'2020-01-01','Aster');
+INSERT INTO "synonym_links" VALUES (900008,900007,'2020-01-01');
+INSERT INTO "taxonomic_units" ("tsn","unit_name1","unit_name2","unit_name3","name_usage","credibility_rtng","initial_time_stamp","parent_tsn","kingdom_id","rank_id","update_date","complete_name") VALUES (900009,'Symphyotrichum','novae-angliae',NULL,'accepted','TWG standards met','2000-01-01 00:00:00',900007,3,220,'2020-01-01','Symphyotrichum novae-angliae');
+-- a genus synonym whose target is not accepted either
+INSERT INTO "taxonomic_units" ("tsn","unit_name1","unit_name2","unit_name3","name_usage","credibility_rtng","initial_time_stamp","parent_tsn","kingdom_id","rank_id","update_date","complete_name") VALUES (900010,'Virgulus',NULL,NULL,'not accepted','TWG standards met','2000-01-01 00:00:00',NULL,3,180,'2020-01-01','Virgulus');
+INSERT INTO "taxonomic_units" ("tsn","unit_name1","unit_name2","unit_name3","name_usage","credibility_rtng","initial_time_stamp","parent_tsn","kingdom_id","rank_id","update_date","complete_name") VALUES (900011,'Lasallea',NULL,NULL,'not accepted','TWG standards met','2000-01-01 00:00:00',NULL,3,180,'2020-01-01','Lasallea');
+INSERT INTO "synonym_links" VALUES (900011,900010,'2020-01-01');
+COMMIT;
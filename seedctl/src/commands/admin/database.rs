@@ -5,17 +5,17 @@ use crate::{
 use anyhow::{Context, Result, anyhow};
 use csv::ReaderBuilder;
 use futures::StreamExt;
-use indicatif::{HumanBytes, ProgressBar, ProgressIterator};
+use indicatif::{HumanBytes, ProgressBar};
 use libseed::{
     Database,
     core::database::UpgradeAction,
-    taxonomy::{Germination, KINGDOM_PLANTAE, NativeStatus, Rank, Taxon},
+    taxonomy::{KINGDOM_PLANTAE, NativeStatus, Rank, Taxon},
 };
-use sqlx::Row;
+use sqlx::{Connection, QueryBuilder, SqliteConnection};
 use tracing::{debug, trace, warn};
 
 use std::{
-    collections::HashMap,
+    collections::{HashMap, HashSet},
     fs::File,
     io::{BufReader, Write},
     path::{Path, PathBuf},
@@ -259,47 +259,198 @@ const GERMINATION_FIELDS: [&str; 7] = [
     "X", "genus", "X", "species", "subttype", "subtaxa", "germcode",
 ];
 
+// Size of the read buffer used when parsing species lists. The csv crate
+// defaults to 8 KiB, which means a lot of small reads for lists that are
+// several megabytes in size.
+const CSV_BUFFER_CAPACITY: usize = 1 << 20;
+
+// Number of rows inserted per statement by multi-row INSERTs, which keeps us
+// well below sqlite's limit on bound parameters
+const INSERT_BATCH_SIZE: usize = 1000;
+
+/// The name components and rank that identify a taxon in a species list
+#[derive(Debug, Clone, PartialEq, Eq, Hash)]
+struct TaxonKey {
+    name1: String,
+    name2: String,
+    name3: String,
+    rank: Rank,
+}
+
+impl TaxonKey {
+    /// Returns the key that this taxon is stored under in a [TaxonIndex].
+    /// Names are compared case-insensitively, so that e.g. 'carex Lurida'
+    /// still matches 'Carex lurida', and species are matched on their first
+    /// two name components only.
+    fn index_key(&self) -> TaxonKey {
+        TaxonKey {
+            name1: self.name1.to_lowercase(),
+            name2: self.name2.to_lowercase(),
+            name3: match self.rank {
+                Rank::Species => String::new(),
+                _ => self.name3.to_lowercase(),
+            },
+            rank: self.rank,
+        }
+    }
+}
+
+/// Returns the rank of a taxon in a species list given the indicator in front
+/// of its third name component (e.g. 'var.' or 'subsp.').
+fn indicator_rank(indicator: &str) -> Rank {
+    // forms need their own rank as well; otherwise they would silently be
+    // matched against the species that they belong to
+    match indicator {
+        "var." => Rank::Variety,
+        "subsp." => Rank::Subspecies,
+        "f." => Rank::Form,
+        _ => Rank::Species,
+    }
+}
+
 // --- Structs for Database Rows (derive sqlx::FromRow) ---
+// `kind` is 0 for a name that is itself accepted and 1 for a name that was
+// resolved through a synonym
 #[derive(Debug, sqlx::FromRow)]
-struct TsnResult {
-    tsn: i32,
+struct TaxonMatchRow {
+    kind: i64,
+    #[sqlx(flatten)]
+    taxon: Taxon,
 }
 
-async fn find_genus_synonym(db: &Database, genus: &str) -> anyhow::Result<Option<String>> {
-    debug!("Looking for a synonym for {}", genus);
+// the `key_name*` columns hold the name that was matched, which is either
+// the accepted taxon's own name or the name of one of its synonyms
+#[derive(Debug, sqlx::FromRow)]
+struct TaxonIndexRow {
+    key_name1: Option<String>,
+    key_name2: Option<String>,
+    key_name3: Option<String>,
+    key_rank_id: i64,
+    #[sqlx(flatten)]
+    taxon_match: TaxonMatchRow,
+}
 
-    let tsn_record: Option<TsnResult> = sqlx::query_as(
-        r#"SELECT S.tsn_accepted as tsn from taxonomic_units T
-           INNER JOIN synonym_links S ON T.tsn=S.tsn
-           WHERE name_usage='not accepted' AND unit_name1=?1
-           AND kingdom_id=?2 and rank_id=?3"#,
-    )
-    .bind(genus)
-    .bind(KINGDOM_PLANTAE)
-    .bind(Rank::Genus as i32)
-    .fetch_optional(db.pool())
-    .await?;
+/// Configures `conn` for the large sequential reads done while matching a
+/// species list: the taxonomy is memory-mapped, the page cache is enlarged
+/// so that the taxonomy tables stay cached, and temporary storage (e.g. for
+/// the germination staging table) is kept in memory. These settings only
+/// apply to this connection.
+async fn tune_lookup_connection(conn: &mut SqliteConnection) -> sqlx::Result<()> {
+    for pragma in [
+        // 1 GiB
+        "PRAGMA mmap_size=1073741824",
+        // a negative value sets the size in KiB rather than in pages
+        "PRAGMA cache_size=-200000",
+        "PRAGMA temp_store=MEMORY",
+    ] {
+        sqlx::query(pragma).execute(&mut *conn).await?;
+    }
+    Ok(())
+}
 
-    if let Some(tsn_res) = tsn_record {
-        debug!("Found synonym {}, looking up info about it", tsn_res.tsn);
+/// An in-memory index of every accepted plant species and infraspecific taxon,
+/// keyed by both its own name and the names of its synonyms, along with a map
+/// of genus synonyms. Loading the whole index with a couple of sequential
+/// scans is much cheaper than querying the database for each taxon in a
+/// species list.
+struct TaxonIndex {
+    taxa: HashMap<TaxonKey, (Taxon, bool)>,
+    genus_synonyms: HashMap<String, String>,
+}
 
-        // Corrected to select only 'genus' as per Python logic (which only returns row["genus"])
-        let accepted_genus_info = sqlx::query(
-            r#"SELECT T.unit_name1 as genus FROM taxonomic_units T
-               WHERE T.tsn=?1 AND name_usage='accepted' AND kingdom_id=?2"#,
+impl TaxonIndex {
+    async fn load(conn: &mut SqliteConnection) -> sqlx::Result<Self> {
+        let mut rows = sqlx::query_as::<_, TaxonIndexRow>(
+            r#"SELECT T.unit_name1 AS key_name1, T.unit_name2 AS key_name2,
+               T.unit_name3 AS key_name3, T.rank_id AS key_rank_id, 0 AS kind, T.*
+               FROM taxonomic_units T
+               WHERE T.name_usage='accepted' AND T.kingdom_id=?1
+               AND T.rank_id IN (?2, ?3, ?4, ?5)
+               UNION ALL
+               SELECT T1.unit_name1 AS key_name1, T1.unit_name2 AS key_name2,
+               T1.unit_name3 AS key_name3, T1.rank_id AS key_rank_id, 1 AS kind, T2.*
+               FROM taxonomic_units T1
+               INNER JOIN synonym_links S ON S.tsn=T1.tsn
+               INNER JOIN taxonomic_units T2 ON T2.tsn=S.tsn_accepted
+               WHERE T1.name_usage='not accepted' AND T1.kingdom_id=?1
+               AND T1.rank_id IN (?2, ?3, ?4, ?5)
+               AND T2.name_usage='accepted' AND T2.kingdom_id=?1"#,
         )
-        .bind(tsn_res.tsn)
         .bind(KINGDOM_PLANTAE)
-        .fetch_optional(db.pool())
-        .await?;
+        .bind(Rank::Species as i32)
+        .bind(Rank::Subspecies as i32)
+        .bind(Rank::Variety as i32)
+        .bind(Rank::Form as i32)
+        .fetch(&mut *conn);
+
+        // an accepted name always takes precedence over a synonym with the
+        // same name, regardless of the order that the rows are returned in.
+        // The rows are streamed so that only the finished index is held in
+        // memory.
+        let mut taxa = HashMap::new();
+        while let Some(row) = rows.next().await {
+            let row = row?;
+            let TaxonMatchRow { kind, taxon } = row.taxon_match;
+            let Some(rank) = usize::try_from(row.key_rank_id)
+                .ok()
+                .and_then(Rank::from_repr)
+            else {
+                continue;
+            };
+            let key = TaxonKey {
+                name1: row.key_name1.unwrap_or_default(),
+                name2: row.key_name2.unwrap_or_default(),
+                name3: row.key_name3.unwrap_or_default(),
+                rank,
+            }
+            .index_key();
+            if kind == 0 {
+                taxa.insert(key, (taxon, false));
+            } else {
+                taxa.entry(key).or_insert((taxon, true));
+            }
+        }
+        drop(rows);
+        trace!("Indexed {} taxon names", taxa.len());
 
-        if let Some(ag_info) = accepted_genus_info {
-            let genus: String = ag_info.try_get("genus")?;
-            trace!("Accepted Genus Info: genus={genus}");
-            return Ok(Some(genus)); // ag_info.genus is already Option<String>
+        let genus_rows: Vec<(String, String)> = sqlx::query_as(
+            r#"SELECT T.unit_name1, T2.unit_name1 FROM taxonomic_units T
+               INNER JOIN synonym_links S ON T.tsn=S.tsn
+               INNER JOIN taxonomic_units T2 ON T2.tsn=S.tsn_accepted
+               WHERE T.name_usage='not accepted' AND T.kingdom_id=?1 AND T.rank_id=?2
+               AND T2.name_usage='accepted' AND T2.kingdom_id=?1"#,
+        )
+        .bind(KINGDOM_PLANTAE)
+        .bind(Rank::Genus as i32)
+        .fetch_all(&mut *conn)
+        .await?;
+        let mut genus_synonyms = HashMap::new();
+        for (genus, accepted_genus) in genus_rows {
+            genus_synonyms
+                .entry(genus.to_lowercase())
+                .or_insert(accepted_genus);
         }
+        trace!("Indexed {} genus synonyms", genus_synonyms.len());
+
+        Ok(Self {
+            taxa,
+            genus_synonyms,
+        })
+    }
+
+    /// Returns the accepted taxon for the given key and whether it was found
+    /// via a synonym. See [TaxonKey::index_key] for how names are matched.
+    fn get(&self, key: &TaxonKey) -> Option<&(Taxon, bool)> {
+        debug!("Looking up information for {key:?}");
+        self.taxa.get(&key.index_key())
+    }
+
+    fn find_genus_synonym(&self, genus: &str) -> Option<&str> {
+        debug!("Looking for a synonym for {}", genus);
+        self.genus_synonyms
+            .get(&genus.to_lowercase())
+            .map(String::as_str)
     }
-    Ok(None)
 }
 
 fn displayname(name1: &str, name2: &str, name3: &str) -> String {
@@ -316,64 +467,6 @@ fn displayname(name1: &str, name2: &str, name3: &str) -> String {
     parts.join(" ")
 }
 
-async fn find_synonym(
-    db: &Database,
-    name1: &str,
-    name2: &str,
-    name3: &str,
-    rank: Rank,
-) -> sqlx::Result<Option<Taxon>> {
-    let dname = displayname(name1, name2, name3);
-    debug!("Looking for a synonym for {}", dname);
-
-    let accepted_tsn_row: Option<TsnResult> = if rank == Rank::Species {
-        sqlx::query_as(
-            r#"SELECT S.tsn_accepted as tsn from taxonomic_units T
-               INNER JOIN synonym_links S ON T.tsn=S.tsn
-               WHERE name_usage='not accepted' AND unit_name1=?1 and unit_name2=?2
-               AND kingdom_id=?3 and rank_id=?4"#,
-        )
-        .bind(name1)
-        .bind(name2)
-        .bind(KINGDOM_PLANTAE)
-        .bind(rank as i32)
-        .fetch_optional(db.pool())
-        .await?
-    } else {
-        sqlx::query_as(
-            r#"SELECT S.tsn_accepted as tsn from taxonomic_units T
-               INNER JOIN synonym_links S ON T.tsn=S.tsn
-               WHERE name_usage='not accepted' AND unit_name1=?1 and unit_name2=?2
-               AND unit_name3=?3 AND kingdom_id=?4 and rank_id=?5"#,
-        )
-        .bind(name1)
-        .bind(name2)
-        .bind(name3)
-        .bind(KINGDOM_PLANTAE)
-        .bind(rank as i32)
-        .fetch_optional(db.pool())
-        .await?
-    };
-
-    if let Some(row) = accepted_tsn_row {
-        trace!("Found synonym TSN for {}: {}", dname, row.tsn);
-        debug!("Found synonym {}, looking up info about it", row.tsn);
-        sqlx::query_as(
-            r#"SELECT T.*,
-               GROUP_CONCAT(V.vernacular_name) AS common_names
-               FROM taxonomic_units T LEFT JOIN vernaculars V ON V.tsn=T.tsn
-               WHERE T.tsn=?1 AND name_usage='accepted' AND kingdom_id=?2
-               GROUP BY T.tsn"#,
-        )
-        .bind(row.tsn)
-        .bind(KINGDOM_PLANTAE)
-        .fetch_optional(db.pool())
-        .await
-    } else {
-        Ok(None)
-    }
-}
-
 #[derive(Debug, sqlx::FromRow)]
 struct PossibilityRow {
     tsn: i64,
@@ -381,7 +474,7 @@ struct PossibilityRow {
 }
 
 async fn find_possibilities(
-    db: &Database,
+    conn: &mut SqliteConnection,
     name1: &str,
     name2: &str,
     name3: &str,
@@ -390,77 +483,29 @@ async fn find_possibilities(
     debug!("Looking for other possibilities for {} {}", name1, name2);
 
     if rank == Rank::Species {
-        sqlx::query_as("SELECT tsn, complete_name FROM taxonomic_units T WHERE unit_name1 like ? OR unit_name2 LIKE ? AND kingdom_id=?")
-            .bind(name1)
-            .bind(name2)
-            .bind(KINGDOM_PLANTAE)
-            .fetch_all(db.pool())
-            .await
-    } else {
-        sqlx::query_as("SELECT tsn, complete_name FROM taxonomic_units T WHERE unit_name1 like ? OR unit_name2 OR unit_name3 LIKE ? AND kingdom_id=?")
-            .bind(name1)
-            .bind(name2)
-            .bind(name3)
-            .bind(KINGDOM_PLANTAE)
-            .fetch_all(db.pool())
-            .await
-    }
-}
-
-async fn get_taxon(
-    db: &Database,
-    name1: &str,
-    name2: &str,
-    name3: &str,
-    rank: Rank,
-) -> sqlx::Result<Option<(Taxon, bool)>> {
-    let mut is_synonym = false;
-    debug!(
-        "Looking up information for ({}, {}, {}, {})",
-        name1, name2, name3, rank
-    );
-
-    let taxon: Option<Taxon> = if rank == Rank::Species {
         sqlx::query_as(
-            r#"SELECT T.*,
-               GROUP_CONCAT(V.vernacular_name) as common_names
-               FROM taxonomic_units T LEFT JOIN vernaculars V ON V.tsn=T.tsn
-               WHERE T.unit_name1=?1 AND T.unit_name2=?2 AND T.name_usage='accepted'
-               AND T.kingdom_id=?3 AND T.rank_id=?4
-               GROUP BY T.tsn"#,
+            r#"SELECT tsn, complete_name FROM taxonomic_units T
+               WHERE (unit_name1=?1 COLLATE NOCASE OR unit_name2=?2 COLLATE NOCASE)
+               AND kingdom_id=?3"#,
         )
         .bind(name1)
         .bind(name2)
         .bind(KINGDOM_PLANTAE)
-        .bind(rank as i32)
-        .fetch_optional(db.pool())
-        .await?
+        .fetch_all(&mut *conn)
+        .await
     } else {
         sqlx::query_as(
-            r#"SELECT T.*,
-               GROUP_CONCAT(V.vernacular_name) as common_names
-               FROM taxonomic_units T LEFT JOIN vernaculars V ON V.tsn=T.tsn
-               WHERE T.unit_name1=?1 AND T.unit_name2=?2 AND T.unit_name3=?3
-               AND T.name_usage='accepted' AND T.kingdom_id=?4 AND T.rank_id=?5
-               GROUP BY T.tsn"#,
+            r#"SELECT tsn, complete_name FROM taxonomic_units T
+               WHERE (unit_name1=?1 COLLATE NOCASE OR unit_name2=?2 COLLATE NOCASE
+               OR unit_name3=?3 COLLATE NOCASE) AND kingdom_id=?4"#,
         )
         .bind(name1)
         .bind(name2)
         .bind(name3)
         .bind(KINGDOM_PLANTAE)
-        .bind(rank as i32)
-        .fetch_optional(db.pool())
-        .await?
-    };
-
-    let taxon = match taxon {
-        Some(taxon) => Some(taxon),
-        None => find_synonym(db, name1, name2, name3, rank)
-            .await
-            .inspect(|_| is_synonym = true)?,
-    };
-
-    Ok(taxon.map(|info| (info, is_synonym)))
+        .fetch_all(&mut *conn)
+        .await
+    }
 }
 
 fn combine_status(old_status: NativeStatus, new_status: NativeStatus) -> NativeStatus {
@@ -476,7 +521,7 @@ fn combine_status(old_status: NativeStatus, new_status: NativeStatus) -> NativeS
 }
 
 async fn handle_taxa_list(
-    pool: &Database,
+    conn: &mut SqliteConnection,
     reader: &mut csv::Reader<File>,
     show_options: bool,
     fields: &[&str],
@@ -514,19 +559,26 @@ async fn handle_taxa_list(
         }
     }
 
-    // determine number of records
-    let first_record = reader.position().clone();
-    let records = reader.records();
-    let nrecords: u64 = records.count().try_into()?;
-    trace!(nrecords);
-
-    reader.seek(first_record)?;
     println!("Analyzing species list and matching against database...");
-    let progress = ProgressBar::new(nrecords);
-    for result in reader.records() {
-        progress.inc(1);
-        let record = result?;
-        let get_field = |col: usize| -> String { record.get(col).unwrap_or("").trim().to_string() };
+    let index = TaxonIndex::load(&mut *conn).await?;
+
+    // the records are matched as they are read rather than collecting the
+    // whole list first, so progress is tracked by bytes read rather than by
+    // number of records
+    let nbytes = reader.get_ref().metadata()?.len();
+    trace!(nbytes);
+    let progress = ProgressBar::new(nbytes);
+    // reuse a single record buffer for every row, only copying the record
+    // for rows that are matched
+    let mut record = csv::StringRecord::new();
+    // species lists often repeat the same taxon with the same data, and
+    // duplicate rows don't change the result, so each is only matched once
+    let mut seen = HashSet::new();
+    while reader.read_record(&mut record)? {
+        progress.set_position(reader.position().byte());
+        // borrow the fields from the record rather than copying each one;
+        // only the name components need to be owned for the lookup key
+        let get_field = |col: usize| record.get(col).unwrap_or("").trim();
 
         let ind1 = get_field(0);
         let name1 = get_field(1);
@@ -539,39 +591,55 @@ async fn handle_taxa_list(
             warn!("Skipping row with empty genus and species.");
             continue;
         }
-        let dname = displayname(&name1, &name2, &name3);
         if ind1 == "X" || ind2 == "X" {
             debug!("Skipping hybrid {} x {} for now", name1, name2);
             continue;
         }
 
-        let mut rank = Rank::Species;
-        if ind3 == "var." {
-            rank = Rank::Variety;
-        } else if ind3 == "subsp." {
-            rank = Rank::Subspecies;
+        let rank = indicator_rank(ind3);
+
+        let key = TaxonKey {
+            name1: name1.to_string(),
+            name2: name2.to_string(),
+            name3: name3.to_string(),
+            rank,
+        };
+        let dname = displayname(name1, name2, name3);
+        // the data columns are compared exactly as they are read when the
+        // matched rows are processed, while the names use the same normalized
+        // key as matching, so that rows which only differ in the case of
+        // their names are duplicates as well
+        let data = (6..record.len())
+            .map(|col| record.get(col).unwrap_or("").to_string())
+            .collect::<Vec<_>>();
+        if !seen.insert((key.index_key(), data)) {
+            debug!("Skipping duplicate row for {dname}");
+            continue;
         }
 
-        if let Some((taxon, is_synonym)) = get_taxon(pool, &name1, &name2, &name3, rank).await? {
+        if let Some((taxon, is_synonym)) = index.get(&key) {
             debug!("Found taxon {dname}: {}", taxon.complete_name);
-            if is_synonym {
+            if *is_synonym {
                 progress.println(format!(
                     "Using '{}' as a synonym for '{dname}'",
                     taxon.complete_name
-                ))
+                ));
             }
-            taxa.push((taxon, record));
+            taxa.push((taxon.clone(), record.clone()));
             continue;
         }
 
-        if let Some(new_genus) = find_genus_synonym(pool, &name1).await?
-            && let Some((taxon, _)) = get_taxon(pool, &new_genus, &name2, &name3, rank).await?
+        if let Some(new_genus) = index.find_genus_synonym(name1)
+            && let Some((taxon, _)) = index.get(&TaxonKey {
+                name1: new_genus.to_string(),
+                ..key
+            })
         {
             progress.println(format!(
                 "Using '{}' as a synonym for '{dname}'",
                 taxon.complete_name
             ));
-            taxa.push((taxon, record));
+            taxa.push((taxon.clone(), record.clone()));
             continue;
         }
 
@@ -580,7 +648,7 @@ async fn handle_taxa_list(
             "WARNING: Unable to find an exact match for {dname}. ",
         ));
         if show_options {
-            let rows = find_possibilities(pool, &name1, &name2, &name3, rank).await?;
+            let rows = find_possibilities(&mut *conn, name1, name2, name3, rank).await?;
 
             if !rows.is_empty() {
                 progress.println(format!(
@@ -608,7 +676,7 @@ async fn handle_germination_list(
     updatedb: bool,
     show_options: bool,
 ) -> anyhow::Result<()> {
-    let (db, matched_taxa) = common_setup(
+    let (mut conn, matched_taxa) = common_setup(
         dbpath.unwrap_or_else(|| "seedcollection.sqlite".into()),
         specieslist,
         show_options,
@@ -616,14 +684,18 @@ async fn handle_germination_list(
     )
     .await?;
 
-    let germinations = Germination::load_all(&db).await?;
-    let germination_map: HashMap<String, i64> = germinations
-        .into_iter()
-        .map(|germ| (germ.code, germ.id))
-        .collect();
-    trace!(?germination_map);
+    // stage the matched taxa and their germination codes in a temporary
+    // table so that the codes can be resolved and inserted by a single
+    // INSERT ... SELECT. Temporary tables are only visible to the connection
+    // that created them, so everything below uses the same connection.
+    sqlx::query("DROP TABLE IF EXISTS temp.germination_staging")
+        .execute(&mut conn)
+        .await?;
+    sqlx::query("CREATE TEMP TABLE germination_staging (tsn INTEGER, code TEXT)")
+        .execute(&mut conn)
+        .await?;
     let germ_codes = matched_taxa
-        .into_iter()
+        .iter()
         .map(|(taxon, csvrecord)| {
             let code = csvrecord.get(6).ok_or_else(|| {
                 anyhow!(
@@ -631,16 +703,34 @@ async fn handle_germination_list(
                     taxon.complete_name
                 )
             })?;
-            let germid = germination_map.get(code).ok_or_else(|| {
-                anyhow!("Failed to find database id for germination code '{code}'")
-            })?;
             trace!(
-                "Found germination id {germid} for taxon {}",
+                "Found germination code {code} for taxon {}",
                 taxon.complete_name
             );
-            Ok((taxon, germid))
+            Ok((taxon.id, code))
         })
         .collect::<anyhow::Result<Vec<_>>>()?;
+    for chunk in germ_codes.chunks(INSERT_BATCH_SIZE) {
+        let mut builder: QueryBuilder<sqlx::Sqlite> =
+            QueryBuilder::new("INSERT INTO germination_staging (tsn, code) ");
+        builder.push_values(chunk, |mut b, (tsn, code)| {
+            b.push_bind(*tsn).push_bind(*code);
+        });
+        builder.build().execute(&mut conn).await?;
+    }
+
+    let unknown_code: Option<String> = sqlx::query_scalar(
+        r#"SELECT S.code FROM temp.germination_staging S
+           LEFT JOIN sc_germination_codes G ON G.code=S.code
+           WHERE G.germid IS NULL LIMIT 1"#,
+    )
+    .fetch_optional(&mut conn)
+    .await?;
+    if let Some(code) = unknown_code {
+        return Err(anyhow!(
+            "Failed to find database id for germination code '{code}'"
+        ));
+    }
 
     if !germ_codes.is_empty() {
         if updatedb
@@ -652,21 +742,19 @@ async fn handle_germination_list(
             .prompt()?
         {
             println!("Adding {} items to the database...", germ_codes.len());
-            let mut tx = db.pool().begin().await?; // Start transaction
-
-            for (taxon, germid) in germ_codes.into_iter().progress() {
-                // it's possible for multiple taxa in the input list to map
-                // to a single taxon in the database, so we may get constraint
-                // violations here if they both map to the same taxon id and
-                // germination id, thus the "OR IGNORE".
-                sqlx::query(
-                    "INSERT OR IGNORE INTO sc_taxon_germination (tsn, germid) VALUES (?1, ?2)",
-                )
-                .bind(taxon.id)
-                .bind(germid)
-                .execute(&mut *tx) // Use the transaction
-                .await?;
-            }
+            let mut tx = conn.begin().await?; // Start transaction
+
+            // it's possible for multiple taxa in the input list to map to a
+            // single taxon in the database, so we may get constraint
+            // violations here if they both map to the same taxon id and
+            // germination id, thus the "OR IGNORE".
+            sqlx::query(
+                r#"INSERT OR IGNORE INTO sc_taxon_germination (tsn, germid)
+                   SELECT S.tsn, G.germid FROM temp.germination_staging S
+                   INNER JOIN sc_germination_codes G ON G.code=S.code"#,
+            )
+            .execute(&mut *tx)
+            .await?; // Use the transaction
             tx.commit().await?; // Commit transaction
             println!("Database update complete.");
         } else {
@@ -676,6 +764,9 @@ async fn handle_germination_list(
         println!("No taxa data to update in the database.");
     }
 
+    sqlx::query("DROP TABLE temp.germination_staging")
+        .execute(&mut conn)
+        .await?;
     Ok(())
 }
 
@@ -685,7 +776,7 @@ async fn handle_native_list(
     updatedb: bool,
     show_options: bool,
 ) -> anyhow::Result<()> {
-    let (db, matched_taxa) = common_setup(
+    let (mut conn, matched_taxa) = common_setup(
         dbpath.unwrap_or_else(|| "seedcollection.sqlite".into()),
         specieslist,
         show_options,
@@ -693,17 +784,24 @@ async fn handle_native_list(
     )
     .await?;
 
+    // key the statuses by taxon id rather than by the whole taxon, so that
+    // merging each row only has to hash an integer
     let taxa_map = matched_taxa
         .into_iter()
-        .fold(HashMap::new(), |mut acc, val| {
-            if let Some(new_status) = val
-                .1
-                .get(6)
-                .and_then(|val| val.parse::<NativeStatus>().ok())
-            {
-                acc.entry(val.0)
-                    .and_modify(|old_status| *old_status = combine_status(*old_status, new_status))
-                    .or_insert(new_status);
+        .fold(HashMap::new(), |mut acc, (taxon, csvrecord)| {
+            match csvrecord.get(6).map(|val| val.parse::<NativeStatus>()) {
+                Some(Ok(new_status)) => {
+                    acc.entry(taxon.id)
+                        .and_modify(|old_status| {
+                            *old_status = combine_status(*old_status, new_status)
+                        })
+                        .or_insert(new_status);
+                }
+                Some(Err(_)) | None => warn!(
+                    "Ignoring invalid native status for {}: {:?}",
+                    taxon.complete_name,
+                    csvrecord.get(6)
+                ),
             }
             acc
         });
@@ -717,20 +815,25 @@ async fn handle_native_list(
             .prompt()?
         {
             println!("Adding {} items to the database...", taxa_map.len());
-            let mut tx = db.pool().begin().await?; // Start transaction
+            let mut tx = conn.begin().await?; // Start transaction
 
             sqlx::query("DELETE FROM 'mntaxa'")
                 .execute(&mut *tx)
                 .await?;
             debug!("Deleted all records from mntaxa");
 
-            for (taxon, native_status) in taxa_map.iter().progress() {
-                sqlx::query("INSERT INTO mntaxa (tsn, native_status) VALUES (?1, ?2)")
-                    .bind(taxon.id)
-                    .bind(native_status.to_string())
-                    .execute(&mut *tx) // Use the transaction
-                    .await?;
+            let rows = taxa_map.iter().collect::<Vec<_>>();
+            let progress = ProgressBar::new(rows.len() as u64);
+            for chunk in rows.chunks(INSERT_BATCH_SIZE) {
+                let mut builder: QueryBuilder<sqlx::Sqlite> =
+                    QueryBuilder::new("INSERT INTO mntaxa (tsn, native_status) ");
+                builder.push_values(chunk, |mut b, (tsn, native_status)| {
+                    b.push_bind(**tsn).push_bind(native_status.to_string());
+                });
+                builder.build().execute(&mut *tx).await?; // Use the transaction
+                progress.inc(chunk.len() as u64);
             }
+            progress.finish();
             tx.commit().await?; // Commit transaction
             println!("Database update complete.");
         } else {
@@ -748,7 +851,7 @@ async fn common_setup(
     specieslist: PathBuf,
     show_options: bool,
     fields: &[&str],
-) -> Result<(Database, Vec<(Taxon, csv::StringRecord)>), anyhow::Error> {
+) -> Result<(SqliteConnection, Vec<(Taxon, csv::StringRecord)>), anyhow::Error> {
     if !Path::new(&specieslist).exists() {
         return Err(anyhow!(
             "Species list CSV file not found: {:?}",
@@ -757,8 +860,141 @@ async fn common_setup(
     }
     let db = Database::open(&db_path).await?;
     trace!("Connected to database: {:?}", db_path);
+    // the species list is matched and the results are written with a single
+    // connection that is tuned for bulk reads. It is detached from the pool
+    // so that those settings don't stay on a pooled connection.
+    let mut conn = db.pool().acquire().await?.detach();
+    tune_lookup_connection(&mut conn).await?;
     let csv_file = File::open(specieslist)?;
-    let mut csvreader = ReaderBuilder::new().has_headers(true).from_reader(csv_file);
-    let matched_taxa = handle_taxa_list(&db, &mut csvreader, show_options, fields).await?;
-    Ok((db, matched_taxa))
+    let mut csvreader = ReaderBuilder::new()
+        .has_headers(true)
+        .buffer_capacity(CSV_BUFFER_CAPACITY)
+        .from_reader(csv_file);
+    let matched_taxa = handle_taxa_list(&mut conn, &mut csvreader, show_options, fields).await?;
+    Ok((conn, matched_taxa))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use sqlx::{Pool, Sqlite};
+
+    fn key(name1: &str, name2: &str, name3: &str, rank: Rank) -> TaxonKey {
+        TaxonKey {
+            name1: name1.to_string(),
+            name2: name2.to_string(),
+            name3: name3.to_string(),
+            rank,
+        }
+    }
+
+    #[test]
+    fn test_index_key_ignores_case() {
+        assert_eq!(
+            key("carex", "lurida", "", Rank::Species),
+            key("Carex", "LURIDA", "", Rank::Species).index_key()
+        );
+        assert_eq!(
+            key("carex", "lurida", "", Rank::Species).index_key(),
+            key("carex", "Lurida", "", Rank::Species).index_key()
+        );
+    }
+
+    #[test]
+    fn test_index_key_species_drops_name3() {
+        assert_eq!(
+            key("viola", "sororia", "", Rank::Species),
+            key("Viola", "sororia", "rubra", Rank::Species).index_key()
+        );
+    }
+
+    #[test]
+    fn test_index_key_infraspecific_keeps_name3() {
+        for rank in [Rank::Subspecies, Rank::Variety, Rank::Form] {
+            assert_eq!(
+                key("viola", "sororia", "rubra", rank),
+                key("Viola", "sororia", "Rubra", rank).index_key()
+            );
+        }
+        assert_ne!(
+            key("Viola", "sororia", "rubra", Rank::Form).index_key(),
+            key("Viola", "sororia", "rubra", Rank::Variety).index_key()
+        );
+    }
+
+    #[test]
+    fn test_indicator_rank() {
+        assert_eq!(indicator_rank(""), Rank::Species);
+        assert_eq!(indicator_rank("var."), Rank::Variety);
+        assert_eq!(indicator_rank("subsp."), Rank::Subspecies);
+        assert_eq!(indicator_rank("f."), Rank::Form);
+        assert_eq!(indicator_rank("unknown"), Rank::Species);
+    }
+
+    #[sqlx::test(
+        migrations = "../db/migrations/",
+        fixtures(path = "../../../../db/fixtures", scripts("species-list-taxa"))
+    )]
+    async fn test_taxon_index(pool: Pool<Sqlite>) {
+        let mut conn = pool.acquire().await.expect("Failed to acquire connection");
+        let index = TaxonIndex::load(&mut conn)
+            .await
+            .expect("Failed to load taxon index");
+        let lookup = |key: TaxonKey| {
+            index
+                .get(&key)
+                .map(|(taxon, is_synonym)| (taxon.id, *is_synonym))
+        };
+
+        // an accepted name takes precedence over a synonym with the same name
+        assert_eq!(
+            lookup(key("Carex", "lurida", "", Rank::Species)),
+            Some((900001, false))
+        );
+        // a synonym resolves to its accepted taxon
+        assert_eq!(
+            lookup(key("Carex", "tuberculata", "", Rank::Species)),
+            Some((900001, true))
+        );
+        // a synonym is keyed by its own rank rather than the accepted taxon's
+        assert_eq!(
+            lookup(key("Viola", "affinis", "", Rank::Species)),
+            Some((900005, true))
+        );
+        assert_eq!(lookup(key("Viola", "affinis", "", Rank::Variety)), None);
+
+        // infraspecific taxa must also match the third name component
+        assert_eq!(
+            lookup(key("Viola", "sororia", "affinis", Rank::Variety)),
+            Some((900005, false))
+        );
+        assert_eq!(lookup(key("Viola", "sororia", "alba", Rank::Variety)), None);
+        assert_eq!(
+            lookup(key("Viola", "sororia", "affinis", Rank::Subspecies)),
+            None
+        );
+        assert_eq!(lookup(key("Viola", "sororia", "", Rank::Species)), None);
+
+        // a genus synonym only resolves to an accepted genus, and is used to
+        // look the taxon up again under the accepted genus
+        assert_eq!(
+            lookup(key("Aster", "novae-angliae", "", Rank::Species)),
+            None
+        );
+        let genus = index.find_genus_synonym("Aster");
+        assert_eq!(genus, Some("Symphyotrichum"));
+        assert_eq!(
+            lookup(key(genus.unwrap(), "novae-angliae", "", Rank::Species)),
+            Some((900009, false))
+        );
+        assert_eq!(index.find_genus_synonym("Lasallea"), None);
+        assert_eq!(index.find_genus_synonym("Symphyotrichum"), None);
+
+        // names are matched case-insensitively
+        assert_eq!(
+            lookup(key("carex", "LURIDA", "", Rank::Species)),
+            Some((900001, false))
+        );
+        assert_eq!(index.find_genus_synonym("aster"), Some("Symphyotrichum"));
+    }
 }